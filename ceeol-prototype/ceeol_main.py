@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 import os
 import json
+import asyncio
 import argparse
+import multiprocessing
+import datetime
+from concurrent.futures import ProcessPoolExecutor
 import pymupdf  # PyMuPDF
 import google.generativeai as genai
 from rich.console import Console
@@ -10,6 +14,25 @@ from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeEl
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 DEFAULT_MODEL = "gemini-2.5-flash-lite-preview-06-17"
 DEFAULT_TEMPERATURE = 0.0
+DEFAULT_CONCURRENCY = 8
+
+# How long the Gemini context cache holding the static prompt is kept alive.
+# The TTL is extended every CONTEXT_CACHE_REFRESH_INTERVAL while files are processed,
+# and the cache is deleted explicitly once all files are done.
+CONTEXT_CACHE_TTL = datetime.timedelta(hours=2)
+CONTEXT_CACHE_REFRESH_INTERVAL = datetime.timedelta(minutes=30)
+
+# Worker processes used to extract PDF page text in parallel.
+# They are spawned rather than forked, because gRPC channels opened for the Gemini API
+# do not survive a fork.
+PDF_TEXT_WORKERS = os.cpu_count() or 1
+PDF_TEXT_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+# Upper bound on the document text sent to Gemini (roughly 200k tokens)
+MAX_PROMPT_CHARS = 800_000
+
+# Pages extracted by one worker at a time; larger documents are split into ranges of this size
+PAGES_PER_RANGE = 8
 
 with open("subject_tree.md", "r") as f:
     subject_tree = f.read()
@@ -48,14 +71,27 @@ LLM_PROMPT = """
     --- SUBJECT TREE START ---
     {subject_tree}
     --- SUBJECT TREE END ---
+"""
 
+DOCUMENT_PROMPT = """
     --- DOCUMENT TEXT START ---
     {pdf_text_content}
     --- DOCUMENT TEXT END ---
 """
 
+# DOCUMENT_PROMPT split around its placeholder once, so per-file prompts are built by plain concatenation
+DOCUMENT_PROMPT_HEAD, DOCUMENT_PROMPT_TAIL = DOCUMENT_PROMPT.split("{pdf_text_content}")
+
+# Instructions, schema and subject tree are identical for every PDF. Keeping them as a byte-identical
+# prefix ahead of the per-file document text lets Gemini reuse its cached processing of the prefix.
+STATIC_PROMPT = LLM_PROMPT.format(subject_tree=subject_tree)
+
 console = Console()
 
+def build_document_prompt(prompt_prefix, document_text):
+    """Builds the prompt for one document: the given prefix followed by the document text section."""
+    return "".join((prompt_prefix, DOCUMENT_PROMPT_HEAD, document_text, DOCUMENT_PROMPT_TAIL))
+
 def configure_gemini():
     """Configures the Gemini API with the key from environment variables."""
 
@@ -70,47 +106,174 @@ def configure_gemini():
     except Exception as e:
         console.print(f"[bold red]An error occurred during Gemini configuration: {e}[/bold red]")
         return False
+
+def iter_page_text(doc, start=0, stop=None):
+    """Yields the text of the pages [start, stop) of an open PDF, one page at a time."""
+
+    if stop is None:
+        stop = doc.page_count
+
+    for i in range(start, stop):
+        yield doc[i].get_text()
+
+def join_text(chunks, limit=MAX_PROMPT_CHARS):
+    """
+    Joins text chunks, stopping once limit characters are reached so the remaining chunks are never produced.
+    Returns a (text, truncated) tuple.
+    """
+
+    joined = []
+    length = 0
+
+    for chunk in chunks:
+        if length + len(chunk) > limit:
+            joined.append(chunk[:limit - length])
+            return "".join(joined), True
+        joined.append(chunk)
+        length += len(chunk)
+
+    return "".join(joined), False
+
+def extract_page_range(page_range):
+    """
+    Process pool worker: extracts the text of pages [start, stop) of a PDF, up to limit characters.
+    Documents cannot be shared between processes, so each worker opens its own copy.
+    Returns a (text, truncated) tuple.
+    """
+
+    file_path, start, stop, limit = page_range
+    with pymupdf.open(file_path) as doc:
+        text, truncated = join_text(iter_page_text(doc, start, stop), limit)
+    return text, truncated
+
+def read_pdf_text(file_path):
+    """
+    Process pool worker: opens a PDF and reads its page count.
+    Documents of up to PAGES_PER_RANGE pages are extracted right away, larger ones are left to extract_pdf_text to split into page ranges.
+    Returns a (page_count, text, truncated) tuple, where text is None when the document was not extracted.
+    """
+
+    with pymupdf.open(file_path) as doc:
+        page_count = doc.page_count
+
+        if page_count <= PAGES_PER_RANGE:
+            text, truncated = join_text(iter_page_text(doc))
+            return page_count, text, truncated
+
+    return page_count, None, False
+
+async def extract_pdf_text(file_path, executor):
+    """
+    Extracts the plain text of every page in a PDF, up to MAX_PROMPT_CHARS characters.
+    PyMuPDF is not thread-safe, so documents are only ever opened by the executor's worker processes;
+    larger documents are split into page ranges extracted in parallel.
+    Returns a (text, page_count, truncated) tuple. Raises if the PDF cannot be opened.
+    """
+
+    loop = asyncio.get_running_loop()
+    page_count, text, truncated = await loop.run_in_executor(executor, read_pdf_text, file_path)
+
+    if text is None:
+        # Ranges are collected in order with at most PDF_TEXT_WORKERS in flight, and each is capped at
+        # the characters still missing, so no more pages are extracted once MAX_PROMPT_CHARS is reached
+        pending = []
+        chunks = []
+        length = 0
+        start = 0
+
+        try:
+            while start < page_count or pending:
+                while start < page_count and len(pending) < PDF_TEXT_WORKERS:
+                    stop = min(start + PAGES_PER_RANGE, page_count)
+                    page_range = (file_path, start, stop, MAX_PROMPT_CHARS - length)
+                    pending.append(loop.run_in_executor(executor, extract_page_range, page_range))
+                    start = stop
+
+                chunk, truncated = await pending.pop(0)
+                chunks.append(chunk)
+                length += len(chunk)
+
+                if truncated or length >= MAX_PROMPT_CHARS:
+                    truncated = truncated or start < page_count or bool(pending)
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+
+        # Ranges submitted before the last chunks arrived may overshoot the limit together
+        text, overshoot = join_text(chunks)
+        truncated = truncated or overshoot
+
+    return text, page_count, truncated
     
-def process_pdf(file_path, model):
+def create_context_cache(model_name):
+    """
+    Stores the role message and the static prompt in a Gemini context cache.
+    Returns the CachedContent, or None if the model does not support caching or the prompt is too short.
+    """
+
+    try:
+        return genai.caching.CachedContent.create(
+            model=model_name,
+            display_name="ceeol-static-prompt",
+            system_instruction=ROLE_MESSAGE_PROMPT,
+            contents=[STATIC_PROMPT],
+            ttl=CONTEXT_CACHE_TTL
+        )
+    except Exception as e:
+        console.print(f"[yellow]Warning: Could not create a context cache, sending the full prompt with every request ({e})[/yellow]")
+        return None
+
+async def keep_context_cache_alive(context_cache):
+    """
+    Extends the context cache TTL every CONTEXT_CACHE_REFRESH_INTERVAL so it cannot expire during a long run.
+    Runs until cancelled.
+    """
+
+    while True:
+        await asyncio.sleep(CONTEXT_CACHE_REFRESH_INTERVAL.total_seconds())
+        try:
+            await asyncio.to_thread(context_cache.update, ttl=CONTEXT_CACHE_TTL)
+        except Exception as e:
+            console.print(f"[yellow]Warning: Could not extend the context cache {context_cache.name} ({e})[/yellow]")
+
+async def process_pdf(file_path, model, executor, prompt_prefix=STATIC_PROMPT):
     """
     Opens a PDF, extracts relevant text, sends it to Gemini, and parses the result.
+    prompt_prefix is prepended to the document text; pass an empty string when the model
+    already holds the static prompt in its context cache.
     Returns a dictionary with extracted data or None on failure.
     """
     
     filename = os.path.basename(file_path)
 
     try:
-        doc = pymupdf.open(file_path)
+        pdf_text_content, page_count, truncated = await extract_pdf_text(file_path, executor)
     except Exception as e:
         console.print(f"  [red]Error: trying to open PDF - {filename} ({e})[/red]")
         return None
 
-    page_count = doc.page_count
-    pdf_text_content = ""
-
-    for page in doc:
-        pdf_text_content += page.get_text()
-    
-    doc.close()
+    if truncated:
+        console.print(f"  [yellow]Warning: Text of {filename} exceeds {MAX_PROMPT_CHARS:,} characters, only the beginning is sent to Gemini.[/yellow]")
 
     if not pdf_text_content.strip():
         console.print(f"  [yellow]Skipping image-based or empty PDF: {filename}[/yellow]")
         return None
 
-    prompt = LLM_PROMPT.format(pdf_text_content=pdf_text_content, subject_tree=subject_tree)
+    prompt = build_document_prompt(prompt_prefix, pdf_text_content)
 
     try:
-        response = model.generate_content(prompt)
-        
+        response = await model.generate_content_async(prompt)
+
         # Clean up potential markdown formatting from the response
-        cleaned_response_text = response.text.strip().replace("```json", "").replace("```", "")
-        
+        cleaned_response_text = response.text.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+
         extracted_data = json.loads(cleaned_response_text)
-        
+
         # Add data we already know
         extracted_data['filename'] = filename
         extracted_data['page_count'] = page_count
-        
+
         return extracted_data
 
     except json.JSONDecodeError:
@@ -120,6 +283,44 @@ def process_pdf(file_path, model):
     except Exception as e:
         console.print(f"  [red]An error occurred while calling the Gemini API for {filename}: {e}[/red]")
         return None
+
+async def process_pdf_bounded(semaphore, progress, task, file_path, model, executor, prompt_prefix):
+    """Runs process_pdf once a concurrency slot is free and reports the outcome on the progress bar."""
+
+    filename = os.path.basename(file_path)
+
+    async with semaphore:
+        progress.update(task, description=f"[green]Processing [bold]{filename}[/bold]...")
+        result = await process_pdf(file_path, model, executor, prompt_prefix)
+
+    if result:
+        console.print(f"  [green]✔ Success:[/green] Extracted data from [bold]{filename}[/bold]")
+    else:
+        console.print(f"  [red]✖ Failed:[/red] Could not process [bold]{filename}[/bold]")
+
+    progress.advance(task)
+    return result
+
+async def process_pdfs(pdf_files, model, executor, prompt_prefix, concurrency, progress, task, context_cache=None):
+    """
+    Processes all PDF files concurrently, keeping at most `concurrency` Gemini requests in flight.
+    The context_cache the model reads from, if any, is kept alive until all files are processed.
+    """
+
+    if context_cache:
+        refresh_task = asyncio.create_task(keep_context_cache_alive(context_cache))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        process_pdf_bounded(semaphore, progress, task, file_path, model, executor, prompt_prefix)
+        for file_path in pdf_files
+    ]
+    results = await asyncio.gather(*tasks)
+
+    if context_cache:
+        refresh_task.cancel()
+
+    return [result for result in results if result]
     
 def main():
     """Main function to orchestrate the CLI tool."""
@@ -143,28 +344,33 @@ def main():
         default=os.getcwd(),
         help="Path to the directory containing PDF files. (default: current directory)"
     )
+    parser.add_argument(
+        '-c', '--concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum number of PDF files processed at the same time. (default: {DEFAULT_CONCURRENCY})"
+    )
     args = parser.parse_args()
 
+    if args.concurrency < 1:
+        console.print("[bold red]Error: --concurrency must be at least 1.[/bold red]")
+        return
+
     console.print("[bold magenta]PDF Data Extractor[/bold magenta]")
 
     if not configure_gemini():
         return
 
-    model = genai.GenerativeModel(
-        model_name=args.model,
-        system_instruction=ROLE_MESSAGE_PROMPT,
-        generation_config=genai.types.GenerationConfig(
-            temperature=DEFAULT_TEMPERATURE,
-            candidate_count=1
-        )
-    )
-    
     input_directory = args.input_dir
     if not os.path.isdir(input_directory):
         console.print(f"[bold red]Error: Input directory not found: {input_directory}[/bold red]")
         return
 
-    pdf_files = [f for f in os.listdir(input_directory) if f.lower().endswith(".pdf")]
+    pdf_files = [
+        os.path.join(input_directory, f)
+        for f in os.listdir(input_directory)
+        if f.lower().endswith(".pdf")
+    ]
 
     if not pdf_files:
         console.print(f"[yellow]No PDF files found in: {input_directory}[/yellow]")
@@ -172,35 +378,52 @@ def main():
 
     console.print(f"Found [cyan]{len(pdf_files)}[/cyan] PDF file(s) to process in [blue]{input_directory}[/blue].")
 
-    all_results = []
-    
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-        TimeElapsedColumn(),
-        console=console
-    ) as progress:
-        task = progress.add_task("[green]Processing PDFs...", total=len(pdf_files))
-        
-        for filename in pdf_files:
-            file_path = os.path.join(input_directory, filename)
-            progress.update(task, description=f"[green]Processing [bold]{filename}[/bold]...")
-            
-            result = process_pdf(file_path, model)
-            if result:
-                all_results.append(result)
-                console.print(f"  [green]✔ Success:[/green] Extracted data from [bold]{filename}[/bold]")
-            else:
-                console.print(f"  [red]✖ Failed:[/red] Could not process [bold]{filename}[/bold]")
-
-            progress.advance(task)
+    generation_config = genai.types.GenerationConfig(
+        temperature=DEFAULT_TEMPERATURE,
+        candidate_count=1
+    )
+
+    context_cache = create_context_cache(args.model)
+    if context_cache:
+        model = genai.GenerativeModel.from_cached_content(
+            cached_content=context_cache,
+            generation_config=generation_config
+        )
+        prompt_prefix = ""
+    else:
+        model = genai.GenerativeModel(
+            model_name=args.model,
+            system_instruction=ROLE_MESSAGE_PROMPT,
+            generation_config=generation_config
+        )
+        prompt_prefix = STATIC_PROMPT
+
+    try:
+        with ProcessPoolExecutor(max_workers=PDF_TEXT_WORKERS, mp_context=PDF_TEXT_MP_CONTEXT) as executor:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+                TimeElapsedColumn(),
+                console=console
+            ) as progress:
+                task = progress.add_task("[green]Processing PDFs...", total=len(pdf_files))
+
+                all_results = asyncio.run(
+                    process_pdfs(pdf_files, model, executor, prompt_prefix, args.concurrency, progress, task, context_cache)
+                )
+    finally:
+        if context_cache:
+            try:
+                context_cache.delete()
+            except Exception as e:
+                console.print(f"[yellow]Warning: Could not delete the context cache {context_cache.name} ({e})[/yellow]")
 
     if not all_results:
         console.print("[yellow]Could not extract data from any of the PDF files.[/yellow]")
         return
-        
+
     try:
         with open(args.output, 'w', encoding='utf-8') as f:
             json.dump(all_results, f, indent=4, ensure_ascii=False)
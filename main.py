@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
 import os
+import re
 import json
+import asyncio
+import hashlib
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import diskcache
+import orjson
 import pymupdf  # PyMuPDF
 import google.generativeai as genai
 from rich.console import Console
@@ -12,16 +19,50 @@ GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 DEFAULT_MODEL = "gemini-2.5-flash-lite-preview-06-17"
 DEFAULT_EXTRACT_SCHEMA = "extraction_schema.json" 
 DEFAULT_TEMPERATURE = 0.0
+DEFAULT_CONCURRENCY = 8
+DEFAULT_CACHE_DIR = ".gemini_cache"
+DEFAULT_BATCH_SIZE = 1
+
+# Text mode batching: a batch is sent once it is full, holds BATCH_MAX_CHARS characters
+# of document text, or BATCH_MAX_WAIT_SECONDS have passed since its first document arrived.
+# Documents longer than BATCH_MAX_CHARS are always sent on their own.
+BATCH_MAX_CHARS = 200_000
+BATCH_MAX_WAIT_SECONDS = 0.1
+
+# Worker processes used to extract PDF page text in parallel.
+# They are spawned rather than forked, because gRPC channels opened for the Gemini API
+# do not survive a fork.
+PDF_TEXT_WORKERS = os.cpu_count() or 1
+PDF_TEXT_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+# Tokens that matter when matching the brackets of a JSON value in a response:
+# escaped characters, quotes, braces and square brackets. Everything else is skipped by the regex engine.
+JSON_STRUCTURE_PATTERN = re.compile(r'\\.|["{}\[\]]', re.DOTALL)
+
+# Upper bound on the document text sent to Gemini (roughly 200k tokens)
+MAX_PROMPT_CHARS = 800_000
+
+# Pages extracted by one worker at a time; larger documents are split into ranges of this size
+PAGES_PER_RANGE = 8
 
 # Gemini file upload limits
 GEMINI_MAX_FILE_SIZE_MB = 50
 GEMINI_MAX_FILE_SIZE_BYTES = GEMINI_MAX_FILE_SIZE_MB * 1024 * 1024
 
-ROLE_MESSAGE_PROMPT = """You are a highly intelligent and extremely precise and accurate at data extraction.
+# Gemini deletes uploaded files after 48 hours; cached uploads expire a little earlier
+UPLOAD_CACHE_TTL_SECONDS = 46 * 60 * 60
+
+ROLE_DESCRIPTION = """You are a highly intelligent and extremely precise and accurate at data extraction.
 You are an expert at analyzing all sorts of documents and structured or unstructured data.
-You will analyze this document and extract structured data according to the provided schema.
+You will analyze this document and extract structured data according to the provided schema."""
+
+ROLE_MESSAGE_PROMPT = ROLE_DESCRIPTION + """
 Your sole output must be a single, valid JSON object that strictly adheres to the provided schema."""
 
+# System instruction for batched text mode requests, which answer with one object per document
+BATCH_ROLE_MESSAGE_PROMPT = ROLE_DESCRIPTION + """
+You will receive several documents at once. Your sole output must be a single, valid JSON array holding one JSON object per document, each strictly adhering to the provided schema."""
+
 # Shared instructions for both text and file modes
 SHARED_INSTRUCTIONS = """
     ### INSTRUCTIONS
@@ -30,7 +71,7 @@ SHARED_INSTRUCTIONS = """
     3.  **Populate the JSON**: Construct a JSON object. The keys in your JSON output **must exactly match** the `keys` from the schema.
     4.  **Handle Missing Data**: If the information is not present, use the JSON value `null`.
     5.  **Respect Data Types**: Extract the data in the correct data type specified in the schema `type` field.
-    6.  **Final Output**: Your response **must only contain the final JSON object**. Do not include any explanations, conversational text like "Here is the JSON you requested:" or markdown formatting like ```json ... ``` before or after the JSON object.
+    6.  **Final Output**: {final_output_rule}
 
     ### ADDITIONAL CONTEXT
     {additional_context}
@@ -41,15 +82,33 @@ SHARED_INSTRUCTIONS = """
     ```
 """
 
-# Text mode specific prompt (adds document text section)
-TEXT_MODE_PROMPT = SHARED_INSTRUCTIONS + """
+# Output rules filled into instruction 6 of the shared instructions, for single documents and for batches
+FINAL_OUTPUT_RULE = """Your response **must only contain the final JSON object**. Do not include any explanations, conversational text like "Here is the JSON you requested:" or markdown formatting like ```json ... ``` before or after the JSON object."""
+BATCH_FINAL_OUTPUT_RULE = """Your response **must only contain a single JSON array** holding one JSON object per document. Do not include any explanations, conversational text like "Here is the JSON you requested:" or markdown formatting like ```json ... ``` before or after the JSON array."""
+
+# Text mode appends the document text section to the shared instructions,
+# file mode sends the shared instructions alongside the uploaded file
+DOCUMENT_TEXT_PROMPT = """
 
     ### DOCUMENT TEXT
     {document_content}
 """
 
-# File mode prompt (uses only shared instructions)
-FILE_MODE_PROMPT = SHARED_INSTRUCTIONS
+# DOCUMENT_TEXT_PROMPT split around its placeholder once, so per-file prompts are built by plain concatenation
+DOCUMENT_TEXT_PROMPT_HEAD, DOCUMENT_TEXT_PROMPT_TAIL = DOCUMENT_TEXT_PROMPT.split("{document_content}")
+
+# Batched text mode tells the model how many documents follow and in which order to answer
+BATCH_PROMPT = """
+
+    ### MULTIPLE DOCUMENTS
+    The texts of {document_count} separate documents follow. Apply the instructions above to each document independently.
+    Your response **must only contain a single JSON array** of exactly {document_count} JSON objects, one per document, in the same order as the documents.
+"""
+
+BATCH_DOCUMENT_HEADER = """
+
+    ### DOCUMENT {document_number} TEXT
+    """
 
 console = Console()
 
@@ -62,22 +121,268 @@ def format_file_size(size_bytes):
     else:
         return f"{size_bytes / 1024 / 1024:.1f} MB"
 
+def iter_pdf_files(root, recursive=False):
+    """
+    Yields the paths of PDF files in root, and in its subdirectories when recursive is set.
+    Uses os.scandir so file types come from the directory listing instead of extra stat calls.
+    Unreadable subdirectories are skipped with a warning; raises OSError if root itself cannot be read.
+    """
+
+    directories = [root]
+
+    while directories:
+        directory = directories.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            if directory == root:
+                raise
+            console.print(f"[yellow]Warning: Skipping unreadable directory {directory} ({e})[/yellow]")
+            continue
+
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        directories.append(entry.path)
+                elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                    yield entry.path
+
 def load_extraction_schema(extraction_schema_file_path):
     """Load extraction schema from external file. Returns parsed schema dict or None if file cannot be read."""
     try:
-        with open(extraction_schema_file_path, 'r', encoding='utf-8') as f:
-            schema_data = json.load(f)
+        with open(extraction_schema_file_path, 'rb') as f:
+            schema_data = orjson.loads(f.read())
         return schema_data
     except FileNotFoundError:
         console.print(f"[bold red]Error: Extraction schema file not found: {extraction_schema_file_path}[/bold red]")
         return None
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         console.print(f"[bold red]Error: Invalid JSON in extraction schema file: {e}[/bold red]")
         return None
     except Exception as e:
         console.print(f"[bold red]Error reading extraction schema file: {e}[/bold red]")
         return None
 
+class ResponseCache:
+    """
+    On-disk cache of parsed Gemini responses.
+    Entries are keyed by a SHA-256 of the document content, the prompt, the model and the temperature,
+    so changing any of them results in a fresh request.
+    """
+
+    def __init__(self, directory, model_name, temperature):
+        self.cache = diskcache.Cache(directory)
+        self.model_name = model_name
+        self.temperature = temperature
+
+    def key(self, *parts):
+        """
+        Builds the cache key for the given request parts (document content, prompt).
+        Each part is encoded and hashed on its own, so the potentially large prompt is never copied
+        into a combined string. surrogatepass keeps stray surrogates from PDF text from failing the encode.
+        """
+        digest = hashlib.sha256()
+        for part in (*parts, self.model_name, str(self.temperature)):
+            digest.update(part.encode('utf-8', 'surrogatepass'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Returns the cached extracted data for key, or None on a miss."""
+        return self.cache.get(key)
+
+    def set(self, key, extracted_data):
+        self.cache.set(key, extracted_data)
+
+    def close(self):
+        self.cache.close()
+
+class UploadCache:
+    """
+    On-disk record of PDFs already uploaded to the Gemini File API, keyed by the SHA-256 of their contents,
+    so later runs reuse the uploaded file instead of sending the same bytes again.
+    """
+
+    def __init__(self, directory):
+        self.cache = diskcache.Cache(directory)
+
+    def get(self, file_digest):
+        """Returns the Gemini file name recorded for file_digest, or None on a miss."""
+        return self.cache.get(file_digest)
+
+    def set(self, file_digest, gemini_file_name):
+        self.cache.set(file_digest, gemini_file_name, expire=UPLOAD_CACHE_TTL_SECONDS)
+
+    def close(self):
+        self.cache.close()
+
+def hash_file(file_path):
+    """Returns the SHA-256 hex digest of a file's contents."""
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_instructions_prompt(extraction_schema, final_output_rule=FINAL_OUTPUT_RULE):
+    """
+    Fills the extraction schema and the output rule into the shared instructions.
+    Called once per run; the result is reused for every file.
+    Pass BATCH_FINAL_OUTPUT_RULE to build the instructions for batched requests.
+    """
+
+    additional_context = extraction_schema.get('additional_context', 'No specific context provided.')
+    fields_json = orjson.dumps(extraction_schema.get('fields', []), option=orjson.OPT_INDENT_2).decode()
+
+    return SHARED_INSTRUCTIONS.format(
+        additional_context=additional_context,
+        extraction_schema=fields_json,
+        final_output_rule=final_output_rule
+    )
+
+def strip_code_fences(text):
+    """
+    Removes a markdown code fence (```json ... ```) wrapped around a response.
+    Only the ends are checked, so fences inside the JSON itself are left untouched.
+    """
+
+    return text.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+
+def extract_json_object(text, opening='{'):
+    """
+    Finds the first JSON object in text by matching brackets in a single forward pass,
+    ignoring brackets inside JSON strings. Pass opening='[' to find a JSON array instead.
+    Returns the value's source text or None if there is none.
+    """
+
+    start = text.find(opening)
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+
+    for match in JSON_STRUCTURE_PATTERN.finditer(text, start):
+        token = match.group()
+        if token == '"':
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif token in '{[':
+            depth += 1
+        elif token in '}]':
+            depth -= 1
+            if depth == 0:
+                return text[start:match.end()]
+
+    return None
+
+def build_document_prompt(prompt_prefix, document_text):
+    """Builds the prompt for one document: the given prefix followed by the document text section."""
+    return "".join((prompt_prefix, DOCUMENT_TEXT_PROMPT_HEAD, document_text, DOCUMENT_TEXT_PROMPT_TAIL))
+
+def build_batch_prompt(prompt_prefix, document_texts):
+    """Builds the prompt for several documents sent together: the given prefix followed by every document text section."""
+
+    parts = [prompt_prefix, BATCH_PROMPT.format(document_count=len(document_texts))]
+    for number, document_text in enumerate(document_texts, start=1):
+        parts += (BATCH_DOCUMENT_HEADER.format(document_number=number), document_text, "\n")
+
+    return "".join(parts)
+
+def parse_batch_response(response_text, document_count):
+    """Parses a batched response into a list of document_count dicts. Raises ValueError on any mismatch."""
+
+    json_text = extract_json_object(strip_code_fences(response_text), opening='[')
+    if json_text is None:
+        raise ValueError("No JSON array found in the response")
+
+    results = json.loads(json_text)
+    if len(results) != document_count or not all(isinstance(result, dict) for result in results):
+        raise ValueError(f"Expected {document_count} JSON objects, got {len(results)} values")
+
+    return results
+
+class DocumentBatcher:
+    """
+    Packs the text mode documents of concurrent process_file calls into shared Gemini requests,
+    so the instructions and schema are sent once per batch instead of once per document.
+    """
+
+    def __init__(self, model, instructions_prompt, batch_size):
+        self.model = model
+        self.instructions_prompt = instructions_prompt
+        self.batch_size = batch_size
+        self.queue = asyncio.Queue()
+        self.requests = set()
+
+    async def submit(self, document_text):
+        """
+        Queues a document and waits for its batch to be processed.
+        Returns the extracted data, or None if the document has to be sent on its own
+        (it was the only one in its batch, or the batch request failed).
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((document_text, future))
+        return await future
+
+    async def run(self):
+        """Collects queued documents into batches and dispatches them until cancelled."""
+
+        loop = asyncio.get_running_loop()
+        carried_over = None
+
+        while True:
+            first = carried_over or await self.queue.get()
+            carried_over = None
+            batch = [first]
+            batch_chars = len(first[0])
+            deadline = loop.time() + BATCH_MAX_WAIT_SECONDS
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+
+                # A cancelled Queue.get never consumes an item, unlike wait_for before Python 3.12
+                getter = asyncio.ensure_future(self.queue.get())
+                await asyncio.wait({getter}, timeout=timeout)
+                if not getter.done():
+                    getter.cancel()
+                    break
+
+                item = getter.result()
+                if batch_chars + len(item[0]) > BATCH_MAX_CHARS:
+                    carried_over = item
+                    break
+                batch.append(item)
+                batch_chars += len(item[0])
+
+            request = asyncio.create_task(self.send(batch))
+            self.requests.add(request)
+            request.add_done_callback(self.requests.discard)
+
+    async def send(self, batch):
+        """Sends one batch to Gemini and resolves the futures of its documents."""
+
+        if len(batch) == 1:
+            batch[0][1].set_result(None)
+            return
+
+        try:
+            prompt = build_batch_prompt(self.instructions_prompt, [document_text for document_text, _ in batch])
+            response = await self.model.generate_content_async(prompt)
+            results = parse_batch_response(response.text, len(batch))
+        except Exception as e:
+            console.print(f"  [yellow]Warning: Batch request for {len(batch)} documents failed, sending them one by one ({e})[/yellow]")
+            results = [None] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
 def configure_gemini():
     """Configures the Gemini API with the key from environment variables."""
 
@@ -92,104 +397,363 @@ def configure_gemini():
     except Exception as e:
         console.print(f"[bold red]An error occurred during Gemini configuration: {e}[/bold red]")
         return False
+
+def iter_page_text(doc, start=0, stop=None):
+    """Yields the text of the pages [start, stop) of an open PDF, one page at a time."""
+
+    if stop is None:
+        stop = doc.page_count
+
+    for i in range(start, stop):
+        yield doc[i].get_text()
+
+def join_text(chunks, limit=MAX_PROMPT_CHARS):
+    """
+    Joins text chunks, stopping once limit characters are reached so the remaining chunks are never produced.
+    Returns a (text, truncated) tuple.
+    """
+
+    joined = []
+    length = 0
+
+    for chunk in chunks:
+        if length + len(chunk) > limit:
+            joined.append(chunk[:limit - length])
+            return "".join(joined), True
+        joined.append(chunk)
+        length += len(chunk)
+
+    return "".join(joined), False
+
+def extract_page_range(page_range):
+    """
+    Process pool worker: extracts the text of pages [start, stop) of a PDF, up to limit characters.
+    Documents cannot be shared between processes, so each worker opens its own copy.
+    Returns a (text, truncated) tuple.
+    """
+
+    file_path, start, stop, limit = page_range
+    with pymupdf.open(file_path) as doc:
+        text, truncated = join_text(iter_page_text(doc, start, stop), limit)
+    return text, truncated
+
+def read_pdf_text(file_path):
+    """
+    Process pool worker: opens a PDF and reads its page count.
+    Documents of up to PAGES_PER_RANGE pages are extracted right away, larger ones are left to extract_pdf_text to split into page ranges.
+    Returns a (page_count, text, truncated) tuple, where text is None when the document was not extracted.
+    """
+
+    with pymupdf.open(file_path) as doc:
+        page_count = doc.page_count
+
+        if page_count <= PAGES_PER_RANGE:
+            text, truncated = join_text(iter_page_text(doc))
+            return page_count, text, truncated
+
+    return page_count, None, False
+
+async def extract_pdf_text(file_path, executor):
+    """
+    Extracts the plain text of every page in a PDF, up to MAX_PROMPT_CHARS characters.
+    PyMuPDF is not thread-safe, so documents are only ever opened by the executor's worker processes;
+    larger documents are split into page ranges extracted in parallel.
+    Returns a (text, truncated) tuple. Raises if the PDF cannot be opened.
+    """
+
+    loop = asyncio.get_running_loop()
+    page_count, text, truncated = await loop.run_in_executor(executor, read_pdf_text, file_path)
+
+    if text is None:
+        # Ranges are collected in order with at most PDF_TEXT_WORKERS in flight, and each is capped at
+        # the characters still missing, so no more pages are extracted once MAX_PROMPT_CHARS is reached
+        pending = []
+        chunks = []
+        length = 0
+        start = 0
+
+        try:
+            while start < page_count or pending:
+                while start < page_count and len(pending) < PDF_TEXT_WORKERS:
+                    stop = min(start + PAGES_PER_RANGE, page_count)
+                    page_range = (file_path, start, stop, MAX_PROMPT_CHARS - length)
+                    pending.append(loop.run_in_executor(executor, extract_page_range, page_range))
+                    start = stop
+
+                chunk, truncated = await pending.pop(0)
+                chunks.append(chunk)
+                length += len(chunk)
+
+                if truncated or length >= MAX_PROMPT_CHARS:
+                    truncated = truncated or start < page_count or bool(pending)
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+
+        # Ranges submitted before the last chunks arrived may overshoot the limit together
+        text, overshoot = join_text(chunks)
+        truncated = truncated or overshoot
+
+    return text, truncated
     
-def process_file(file_path, model, extraction_schema, text_mode=False):
+async def warm_up_model(model):
+    """
+    Sends a free count_tokens request before the concurrent requests start.
+    All async Gemini calls share one gRPC channel, so this opens the connection once up front
+    and reports an unreachable API, invalid key or unknown model before any file is processed.
+    """
+
+    try:
+        await model.count_tokens_async("ping")
+    except Exception as e:
+        console.print(f"[yellow]Warning: Could not reach the Gemini model, only cached responses may succeed: {e}[/yellow]")
+
+def load_cached_response(cache, cache_key, filename):
+    """Returns the cached extracted data for cache_key, or None on a miss."""
+
+    cached_data = cache.get(cache_key)
+    if cached_data is not None:
+        console.print(f"  [dim]Using cached response for {filename}[/dim]")
+    return cached_data
+
+def parse_response(response, filename, cache=None, cache_key=None):
+    """
+    Parses the JSON object out of a Gemini response and stores it in the cache when a cache_key is given.
+    Returns the extracted data or None if the response holds no valid JSON object.
+    """
+
+    # Clean up potential markdown formatting from the response
+    cleaned_response_text = strip_code_fences(response.text)
+
+    # The standard json module keeps integers wider than 64 bits exact, orjson does not
+    try:
+        json_text = extract_json_object(cleaned_response_text)
+        if json_text is None:
+            raise json.JSONDecodeError("No JSON object found", cleaned_response_text, 0)
+
+        extracted_data = json.loads(json_text)
+    except json.JSONDecodeError:
+        console.print(f"  [red]Error: Failed to decode JSON from LLM response for {filename}.[/red]")
+        console.print(f"  [dim]LLM raw response: {response.text[:200]}...[/dim]")
+        return None
+
+    if cache_key is not None:
+        cache.set(cache_key, extracted_data)
+
+    return extracted_data
+
+async def upload_pdf(file_path, file_digest=None, upload_cache=None):
+    """
+    Uploads a PDF to the Gemini File API, reusing an earlier upload of the same content
+    when the upload cache has one that is still available.
+    Returns the uploaded file or None if the upload failed.
+    """
+
+    filename = os.path.basename(file_path)
+
+    if upload_cache is not None:
+        gemini_file_name = upload_cache.get(file_digest)
+        if gemini_file_name is not None:
+            try:
+                uploaded_file = await asyncio.to_thread(genai.get_file, gemini_file_name)
+                if uploaded_file.state.name != "FAILED":
+                    console.print(f"  [dim]Reusing uploaded file for {filename}[/dim]")
+                    return uploaded_file
+            except Exception:
+                # The file expired or was deleted on Gemini's side, upload it again
+                pass
+
+    try:
+        uploaded_file = await asyncio.to_thread(genai.upload_file, file_path)
+    except Exception as e:
+        console.print(f"  [yellow]Warning: File upload failed for {filename}: {e}[/yellow]")
+        return None
+
+    if upload_cache is not None:
+        upload_cache.set(file_digest, uploaded_file.name)
+
+    return uploaded_file
+
+async def run_file_mode(file_path, model, instructions_prompt, cache=None, upload_cache=None):
+    """
+    File Mode: uploads the PDF and sends it to Gemini together with the instructions prompt.
+    With an upload cache the uploaded file is kept for reuse, otherwise it is deleted afterwards.
+    Returns the extracted data or None on failure.
+    """
+
+    filename = os.path.basename(file_path)
+    file_digest = None
+    cache_key = None
+
+    if cache is not None or upload_cache is not None:
+        file_digest = await asyncio.to_thread(hash_file, file_path)
+
+    if cache is not None:
+        cache_key = cache.key(file_digest, instructions_prompt)
+        cached_data = load_cached_response(cache, cache_key, filename)
+        if cached_data is not None:
+            return cached_data
+
+    uploaded_file = await upload_pdf(file_path, file_digest, upload_cache)
+    if uploaded_file is None:
+        return None
+
+    try:
+        response = await model.generate_content_async(
+            [instructions_prompt, uploaded_file]
+        )
+    finally:
+        # Clean up the uploaded file unless it is kept for reuse
+        if upload_cache is None:
+            await asyncio.to_thread(genai.delete_file, uploaded_file.name)
+
+    return parse_response(response, filename, cache, cache_key)
+
+async def run_text_mode(file_path, model, instructions_prompt, executor, cache=None, batcher=None):
+    """
+    Text Mode: extracts the PDF text with PyMuPDF and sends it to Gemini,
+    together with other small documents when a batcher is given.
+    Returns the extracted data or None on failure.
+    """
+
+    filename = os.path.basename(file_path)
+    cache_key = None
+
+    try:
+        pdf_text_content, truncated = await extract_pdf_text(file_path, executor)
+    except Exception as e:
+        console.print(f"  [red]Error: trying to open PDF - {filename} ({e})[/red]")
+        return None
+
+    if truncated:
+        console.print(f"  [yellow]Warning: Text of {filename} exceeds {MAX_PROMPT_CHARS:,} characters, only the beginning is sent to Gemini.[/yellow]")
+
+    if not pdf_text_content.strip():
+        console.print(f"  [yellow]Skipping image-based or empty PDF: {filename}[/yellow]")
+        return None
+
+    prompt = build_document_prompt(instructions_prompt, pdf_text_content)
+
+    if cache is not None:
+        cache_key = cache.key(prompt)
+        cached_data = load_cached_response(cache, cache_key, filename)
+        if cached_data is not None:
+            return cached_data
+
+    if batcher is not None and len(pdf_text_content) <= BATCH_MAX_CHARS:
+        batched_data = await batcher.submit(pdf_text_content)
+        if batched_data is not None:
+            if cache_key is not None:
+                cache.set(cache_key, batched_data)
+            return batched_data
+
+    response = await model.generate_content_async(
+        prompt
+    )
+
+    return parse_response(response, filename, cache, cache_key)
+
+async def process_file(file_path, model, instructions_prompt, executor, cache=None, batcher=None, upload_cache=None, text_mode=False):
     """
     Processes a file using either direct file upload or extracted text.
+    Files over Gemini's upload limit are processed in text mode instead.
+    instructions_prompt is the shared instructions prompt built by build_instructions_prompt.
+    Responses are looked up in and stored to the cache when one is given.
+    In text mode, documents are sent through the batcher when one is given.
+    In file mode, uploads are reused through the upload cache when one is given.
     Returns a dictionary with extracted data or None on failure.
     """
     
     filename = os.path.basename(file_path)
-    
-    additional_context = extraction_schema.get('additional_context', 'No specific context provided.')
-    fields_json = json.dumps(extraction_schema.get('fields', []), indent=2)
 
     try:
         if not text_mode:
-            # File Mode: Upload file directly to Gemini
             file_size = os.path.getsize(file_path)
-            
+
             if file_size > GEMINI_MAX_FILE_SIZE_BYTES:
                 console.print(f"  [yellow]Warning: File {filename} ({format_file_size(file_size)}) exceeds Gemini's {GEMINI_MAX_FILE_SIZE_MB} MB limit. Falling back to text mode.[/yellow]")
-                return None
-            
-            try:
-                uploaded_file = genai.upload_file(file_path)
-                
-                prompt = FILE_MODE_PROMPT.format(
-                    additional_context=additional_context,
-                    extraction_schema=fields_json
-                )
-                
-                response = model.generate_content(
-                    [prompt, uploaded_file]
-                )
-
-                # Clean up the uploaded file
-                genai.delete_file(uploaded_file.name)
-                
-                # Add metadata
-                metadata = {
-                    'filename': filename,
-                    'processing_mode': 'file'
-                }
-            except Exception as e:
-                console.print(f"  [yellow]Warning: File upload failed for {filename}: {e}[/yellow]")
-                return None
-            
-        if text_mode:
-            # Text Mode: Extract text using PyMuPDF
-            try:
-                doc = pymupdf.open(file_path)
-            except Exception as e:
-                console.print(f"  [red]Error: trying to open PDF - {filename} ({e})[/red]")
-                return None
-
-            page_count = doc.page_count
-            pdf_text_content = ""
-
-            for page in doc:
-                pdf_text_content += page.get_text()
-            
-            doc.close()
-
-            if not pdf_text_content.strip():
-                console.print(f"  [yellow]Skipping image-based or empty PDF: {filename}[/yellow]")
-                return None
-
-            prompt = TEXT_MODE_PROMPT.format(
-                document_content=pdf_text_content,
-                additional_context=additional_context,
-                extraction_schema=fields_json
-            )
-            
-            response = model.generate_content(
-                prompt
-            )
-            
-            # Add metadata
-            metadata = {
-                'filename': filename,
-                'processing_mode': 'text'
-            }
-        
-        # Clean up potential markdown formatting from the response
-        cleaned_response_text = response.text.strip().replace("```json", "").replace("```", "")
-        
-        extracted_data = json.loads(cleaned_response_text)
-        
-        # Add metadata we already know
-        extracted_data.update(metadata)
-        
-        return extracted_data
+                text_mode = True
 
-    except json.JSONDecodeError:
-        console.print(f"  [red]Error: Failed to decode JSON from LLM response for {filename}.[/red]")
-        console.print(f"  [dim]LLM raw response: {response.text[:200]}...[/dim]")
-        return None
+        if text_mode:
+            extracted_data = await run_text_mode(file_path, model, instructions_prompt, executor, cache, batcher)
+        else:
+            extracted_data = await run_file_mode(file_path, model, instructions_prompt, cache, upload_cache)
     except Exception as e:
         console.print(f"  [red]An error occurred while processing {filename}: {e}[/red]")
         return None
+
+    if extracted_data is None:
+        return None
+
+    # Add metadata we already know
+    extracted_data.update({
+        'filename': filename,
+        'processing_mode': 'text' if text_mode else 'file'
+    })
+
+    return extracted_data
+
+def dump_json(data, indent=False):
+    """
+    Serializes data to JSON bytes with orjson, falling back to the standard json module
+    for integers wider than 64 bits, which orjson cannot serialize.
+    """
+
+    try:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None)
+    except orjson.JSONEncodeError:
+        if indent:
+            return json.dumps(data, indent=2, ensure_ascii=False).encode()
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+async def process_file_bounded(semaphore, progress, task, file_path, model, instructions_prompt, executor, cache, batcher, upload_cache, results_file, text_mode):
+    """
+    Runs process_file once a concurrency slot is free and reports the outcome on the progress bar.
+    When results_file is given, a successful result is appended to it right away as a JSON line.
+    """
+
+    filename = os.path.basename(file_path)
+
+    async with semaphore:
+        progress.update(task, description=f"[green]Processing [bold]{filename}[/bold]...")
+        result = await process_file(file_path, model, instructions_prompt, executor, cache, batcher, upload_cache, text_mode)
+
+    if result:
+        if results_file is not None:
+            results_file.write(dump_json(result) + b"\n")
+            results_file.flush()
+        console.print(f"  [green]✔ Success:[/green] Extracted data from [bold]{filename}[/bold]")
+    else:
+        console.print(f"  [red]✖ Failed:[/red] Could not process [bold]{filename}[/bold]")
+
+    progress.advance(task)
+    return result
+
+async def process_files(pdf_files, model, instructions_prompt, executor, cache, upload_cache, results_file, args, progress, task, batch_model=None, batch_instructions_prompt=None):
+    """
+    Processes all PDF files concurrently, keeping at most args.concurrency Gemini requests in flight.
+    When batch_model is given, small text mode documents are batched through it with batch_instructions_prompt.
+    """
+
+    await warm_up_model(model)
+
+    batcher = None
+    if batch_model is not None:
+        batcher = DocumentBatcher(batch_model, batch_instructions_prompt, args.batch_size)
+        batcher_task = asyncio.create_task(batcher.run())
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    tasks = [
+        process_file_bounded(semaphore, progress, task, file_path, model, instructions_prompt, executor, cache, batcher, upload_cache, results_file, args.text_mode)
+        for file_path in pdf_files
+    ]
+    results = await asyncio.gather(*tasks)
+
+    if batcher is not None:
+        batcher_task.cancel()
+
+    return [result for result in results if result]
     
 def main():
     """Main function to orchestrate the CLI tool."""
@@ -201,7 +765,7 @@ def main():
     parser.add_argument(
         '-o', '--output',
         default="extraction_results.json",
-        help="The name of the output JSON file. (default: extraction_results.json)"
+        help="The name of the output JSON file. Use a .jsonl extension to write one JSON object per line as each file completes. (default: extraction_results.json)"
     )
     parser.add_argument(
         '-m', '--model',
@@ -234,21 +798,58 @@ def main():
         action='store_true',
         help="Extract text from files and send to Gemini instead of uploading files directly. Use this for files over 50MB or when file upload fails."
     )
+    parser.add_argument(
+        '-c', '--concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum number of PDF files processed at the same time. (default: {DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        '-b', '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Text mode only: maximum number of small documents sent to Gemini in a single request. (default: {DEFAULT_BATCH_SIZE}, no batching)"
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory used to cache Gemini responses between runs. (default: {DEFAULT_CACHE_DIR})"
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Always send requests to Gemini instead of reusing cached responses. (default: False)"
+    )
+    parser.add_argument(
+        '--no-upload-cache',
+        action='store_true',
+        help="File mode only: upload every file again and delete it afterwards instead of keeping uploads for reuse. (default: False)"
+    )
     
     args = parser.parse_args()
 
+    if args.concurrency < 1:
+        console.print("[bold red]Error: --concurrency must be at least 1.[/bold red]")
+        return
+
+    if args.batch_size < 1:
+        console.print("[bold red]Error: --batch-size must be at least 1.[/bold red]")
+        return
+
     console.print("[bold magenta]PDF Data Extractor[/bold magenta]")
 
     if not configure_gemini():
         return
 
+    generation_config = genai.types.GenerationConfig(
+        temperature=args.temperature,
+        candidate_count=1
+    )
+
     model = genai.GenerativeModel(
         model_name=args.model,
         system_instruction=ROLE_MESSAGE_PROMPT,
-        generation_config=genai.types.GenerationConfig(
-            temperature=args.temperature,
-            candidate_count=1
-        )
+        generation_config=generation_config
     )
     
     input_directory = args.input_dir
@@ -263,15 +864,11 @@ def main():
         console.print(f"[bold red]Error: No fields specified in the extraction schema.[/bold red]")
         return
 
-    pdf_files = []
-
-    if args.recursive:    
-        for root, dirs, files in os.walk(input_directory):
-            for file in files:
-                if file.lower().endswith(".pdf"):
-                    pdf_files.append(os.path.join(root, file))
-    else:   
-        pdf_files = [f for f in os.listdir(input_directory) if f.lower().endswith(".pdf")]
+    try:
+        pdf_files = list(iter_pdf_files(input_directory, args.recursive))
+    except OSError as e:
+        console.print(f"[bold red]Error: Could not read input directory {input_directory}: {e}[/bold red]")
+        return
 
     if not pdf_files:
         console.print(f"[yellow]No PDF files found in: {input_directory}[/yellow]")
@@ -279,38 +876,75 @@ def main():
 
     console.print(f"Found [cyan]{len(pdf_files)}[/cyan] PDF file(s) to process in [blue]{input_directory}[/blue] and subdirectories.")
 
-    all_results = []
-    
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-        TimeElapsedColumn(),
-        console=console
-    ) as progress:
-        task = progress.add_task("[green]Processing PDFs...", total=len(pdf_files))
-        
-        for file_path in pdf_files:
-            filename = os.path.basename(file_path)
-            progress.update(task, description=f"[green]Processing [bold]{filename}[/bold]...")
-            
-            result = process_file(file_path, model, extraction_schema, args.text_mode)
-            if result:
-                all_results.append(result)
-                console.print(f"  [green]✔ Success:[/green] Extracted data from [bold]{filename}[/bold]")
-            else:
-                console.print(f"  [red]✖ Failed:[/red] Could not process [bold]{filename}[/bold]")
-
-            progress.advance(task)
+    instructions_prompt = build_instructions_prompt(extraction_schema)
+
+    # Batches ask for an array of results, so they go through a model whose system instruction says so
+    batch_model = None
+    batch_instructions_prompt = None
+    if args.text_mode and args.batch_size > 1:
+        batch_model = genai.GenerativeModel(
+            model_name=args.model,
+            system_instruction=BATCH_ROLE_MESSAGE_PROMPT,
+            generation_config=generation_config
+        )
+        batch_instructions_prompt = build_instructions_prompt(extraction_schema, BATCH_FINAL_OUTPUT_RULE)
+
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ResponseCache(args.cache_dir, args.model, args.temperature)
+        except Exception as e:
+            console.print(f"[yellow]Warning: Could not open response cache {args.cache_dir}, continuing without it: {e}[/yellow]")
+
+    upload_cache = None
+    if not args.text_mode and not args.no_upload_cache:
+        upload_cache_dir = os.path.join(args.cache_dir, "uploads")
+        try:
+            upload_cache = UploadCache(upload_cache_dir)
+        except Exception as e:
+            console.print(f"[yellow]Warning: Could not open upload cache {upload_cache_dir}, continuing without it: {e}[/yellow]")
+
+    # JSON Lines output is written incrementally, so results survive an interrupted run
+    results_file = None
+    if args.output.lower().endswith('.jsonl'):
+        try:
+            results_file = open(args.output, 'wb')
+        except Exception as e:
+            console.print(f"[bold red]Error opening output file: {e}[/bold red]")
+            return
+
+    with ProcessPoolExecutor(max_workers=PDF_TEXT_WORKERS, mp_context=PDF_TEXT_MP_CONTEXT) as executor:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            TimeElapsedColumn(),
+            console=console
+        ) as progress:
+            task = progress.add_task("[green]Processing PDFs...", total=len(pdf_files))
+
+            all_results = asyncio.run(
+                process_files(pdf_files, model, instructions_prompt, executor, cache, upload_cache, results_file, args, progress, task, batch_model, batch_instructions_prompt)
+            )
+
+    if cache is not None:
+        cache.close()
+
+    if upload_cache is not None:
+        upload_cache.close()
+
+    if results_file is not None:
+        results_file.close()
 
     if not all_results:
         console.print("[yellow]Could not extract data from any of the PDF files.[/yellow]")
         return
-        
+
     try:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(all_results, f, indent=4, ensure_ascii=False)
+        if results_file is None:
+            with open(args.output, 'wb') as f:
+                f.write(dump_json(all_results, indent=True))
         console.print(f"\n[bold green]✓ Done! All data saved to [cyan]{args.output}[/cyan][/bold green]")
     except Exception as e:
         console.print(f"\n[bold red]Error saving results to file: {e}[/bold red]")